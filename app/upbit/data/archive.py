@@ -0,0 +1,267 @@
+from datetime import datetime, timedelta, timezone
+import os
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from sqlalchemy import text
+
+from db_engine import get_engine
+from saveprice import get_table_name
+
+# 기본값은 저장소 최상위의 archive/ (소스 디렉토리(app/upbit) 밖이라 이미지에 복사되지 않음)
+ARCHIVE_DIR = os.environ.get('ARCHIVE_DIR', os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..', 'archive')))
+
+PRICE_COLUMNS = ['open', 'high', 'low', 'close', 'volume', 'trade_price']
+TIMESTAMP_COLUMNS = ['timestamp_utc', 'timestamp_kst', 'created_at']
+
+def get_columns(table_name):
+    """
+    테이블에서 조회/보관하는 컬럼 목록 (id 제외)
+    """
+    columns = ['market', 'timestamp_utc', 'timestamp_kst'] + PRICE_COLUMNS
+    if table_name == 'upbit_daily_price':
+        columns.append('change_rate')
+    return columns + ['created_at']
+
+def get_schema(table_name):
+    """
+    테이블의 Numeric 정밀도를 그대로 유지하는 Parquet 스키마
+    """
+    fields = [
+        pa.field('market', pa.string()),
+        pa.field('timestamp_utc', pa.timestamp('us', tz='UTC')),
+        pa.field('timestamp_kst', pa.timestamp('us', tz='UTC')),
+        pa.field('open', pa.decimal128(20, 8)),
+        pa.field('high', pa.decimal128(20, 8)),
+        pa.field('low', pa.decimal128(20, 8)),
+        pa.field('close', pa.decimal128(20, 8)),
+        pa.field('volume', pa.decimal128(20, 8)),
+        pa.field('trade_price', pa.decimal128(30, 8)),
+    ]
+    if table_name == 'upbit_daily_price':
+        fields.append(pa.field('change_rate', pa.decimal128(10, 4)))
+    fields.append(pa.field('created_at', pa.timestamp('us', tz='UTC')))
+    return pa.schema(fields)
+
+def get_read_schema(schema):
+    """
+    Numeric(decimal) 컬럼을 DB 조회 결과(pd.read_sql)와 같은 float64 로 바꾼 스키마
+    """
+    return pa.schema([pa.field(f.name, pa.float64()) if pa.types.is_decimal(f.type) else f for f in schema])
+
+def get_partition_dir(table_name, market):
+    return os.path.join(ARCHIVE_DIR, table_name, f"market={market}")
+
+def list_archive_files(table_name, market):
+    """
+    마켓의 아카이브 파일 목록을 (월, 경로) 로 반환하는 함수 (월 오름차순)
+
+    파일 이름은 '<YYYY-MM>.parquet' 이고, 이미 보관된 월에 나중에 캔들이 추가로 보관되면
+    '<YYYY-MM>.<n>.parquet' 로 새 파일을 만들기 때문에 한 번 쓴 파일은 바뀌지 않음
+    """
+    partition_dir = get_partition_dir(table_name, market)
+    if not os.path.isdir(partition_dir):
+        return []
+    files = []
+    for name in os.listdir(partition_dir):
+        if name.endswith('.parquet'):
+            files.append((name[:7], os.path.join(partition_dir, name)))
+    return sorted(files)
+
+def month_range(month):
+    """
+    month(해당 월 1일, UTC) 부터 다음 달 1일까지의 구간
+    """
+    if month.month == 12:
+        return month, month.replace(year=month.year + 1, month=1)
+    return month, month.replace(month=month.month + 1)
+
+def write_archive_file(table_name, market, month, df):
+    """
+    한 달치 캔들을 zstd 압축 Parquet 파일로 쓰는 함수 (임시 파일에 쓴 뒤 이름을 바꿈)
+    """
+    partition_dir = get_partition_dir(table_name, market)
+    os.makedirs(partition_dir, exist_ok=True)
+
+    name = month.strftime('%Y-%m')
+    path = os.path.join(partition_dir, f"{name}.parquet")
+    part = 1
+    while os.path.exists(path):
+        path = os.path.join(partition_dir, f"{name}.{part}.parquet")
+        part += 1
+
+    # DB 세션 TimeZone 에 따라 +09:00 등으로 조회되므로 UTC 로 맞춰서 저장
+    df = df.assign(**{col: pd.to_datetime(df[col], utc=True) for col in TIMESTAMP_COLUMNS})
+    table = pa.Table.from_pandas(df, schema=get_schema(table_name), preserve_index=False)
+    temp_path = f"{path}.tmp"
+    pq.write_table(table, temp_path, compression='zstd')
+    with open(temp_path, 'rb') as f:
+        os.fsync(f.fileno())
+    os.replace(temp_path, path)
+
+    # 다시 읽어서 행 수를 확인한 뒤에만 DB에서 삭제함
+    if pq.read_metadata(path).num_rows != len(df):
+        os.remove(path)
+        raise RuntimeError(f"아카이브 파일 검증 실패: {path}")
+    return path
+
+def archive_table(candle_type, age_days, debug=False):
+    """
+    age_days 보다 오래된 캔들을 월 단위 Parquet 파일로 옮기고 DB에서 삭제하는 함수
+
+    한 달이 통째로 기준보다 오래된 경우만 보관하며, 월 단위로
+    DELETE ... RETURNING 으로 가져온 행을 파일로 쓴 뒤에 커밋하므로
+    파일 쓰기에 실패하면 삭제도 되돌려짐
+
+    Args:
+        candle_type (str): 캔들 타입 ('day', '1min', '3min', '5min', '10min', '30min', '1hour')
+        age_days (int): DB에 남겨둘 기간(일)
+
+    Returns:
+        int: 보관한 캔들 수
+    """
+    TABLE_NAME = get_table_name(candle_type)
+    columns = get_columns(TABLE_NAME)
+
+    # 기준 시점이 속한 달의 1일 (이 시점 이전의 달만 보관)
+    cutoff = datetime.now(timezone.utc) - timedelta(days=age_days)
+    cutoff = cutoff.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+    engine = get_engine()
+    with engine.connect() as conn:
+        partitions = conn.execute(text(f"""
+            SELECT DISTINCT market, date_trunc('month', timestamp_utc AT TIME ZONE 'UTC') AS month
+            FROM {TABLE_NAME}
+            WHERE timestamp_utc < :cutoff
+            ORDER BY market, month
+        """), {'cutoff': cutoff}).all()
+
+    total = 0
+    for market, month in partitions:
+        month = month.replace(tzinfo=timezone.utc)
+        month_start, month_end = month_range(month)
+        with engine.connect() as conn:
+            with conn.begin():
+                result = conn.execute(text(f"""
+                    DELETE FROM {TABLE_NAME}
+                    WHERE market = :market
+                      AND timestamp_utc >= :month_start
+                      AND timestamp_utc < :month_end
+                    RETURNING {', '.join(columns)}
+                """), {'market': market, 'month_start': month_start, 'month_end': month_end})
+                df = pd.DataFrame(result.all(), columns=columns)
+                if df.empty:
+                    continue
+                df = df.sort_values('timestamp_utc')
+                path = write_archive_file(TABLE_NAME, market, month, df)
+        total += len(df)
+        if debug:
+            print(f"{TABLE_NAME} {market} {month.strftime('%Y-%m')} {len(df)}개 보관: {path}")
+    return total
+
+def read_cold(table_name, market, start=None, end=None, count=None):
+    """
+    아카이브 파일에서 캔들을 읽는 함수
+
+    count 가 있으면 최근 달부터 읽어서 count 개가 채워진 달까지만 읽음
+    """
+    files = list_archive_files(table_name, market)
+    if not files:
+        return None
+    months = {}
+    for name, path in files:
+        months.setdefault(name, []).append(path)
+
+    frames = []
+    rows = 0
+    for name in sorted(months, reverse=True):
+        month_start, month_end = month_range(datetime.strptime(name, '%Y-%m').replace(tzinfo=timezone.utc))
+        if start is not None and month_end <= start:
+            break
+        if end is not None and month_start >= end:
+            continue
+        for path in months[name]:
+            # 디렉토리 이름(market=...)을 파티션 컬럼으로 해석하지 않도록 파일 단위로 읽음
+            table = pq.ParquetFile(path).read()
+            # DB 조회 결과와 같은 자료형(float64, 나노초 UTC)으로 변환
+            # (저장된 pandas 메타데이터의 timezone 은 무시하고 Parquet 스키마의 UTC 를 사용)
+            table = table.cast(get_read_schema(table.schema))
+            df = table.to_pandas(ignore_metadata=True, coerce_temporal_nanoseconds=True)
+            if start is not None:
+                df = df[df['timestamp_utc'] >= start]
+            if end is not None:
+                df = df[df['timestamp_utc'] < end]
+            frames.append(df)
+            rows += len(df)
+        if count is not None and rows >= count:
+            break
+    if not frames:
+        return None
+    return pd.concat(frames, ignore_index=True)
+
+def read_candles(market, candle_type, start=None, end=None, count=None):
+    """
+    DB(최근 데이터)와 아카이브 파일(오래된 데이터)을 합쳐서 캔들을 조회하는 함수
+
+    Args:
+        market (str): 마켓 코드 (예: 'KRW-BTC')
+        candle_type (str): 캔들 타입 ('day', '1min', '3min', '5min', '10min', '30min', '1hour')
+        start (datetime): 조회 시작 시점 (UTC, 포함)
+        end (datetime): 조회 종료 시점 (UTC, 미포함)
+        count (int): 최대 캔들 개수 (있으면 가장 최근 count 개)
+
+    Returns:
+        DataFrame: 시간순 정렬된 캔들 데이터 (created_at 제외, 시간은 UTC, 가격/거래량은 float64)
+    """
+    TABLE_NAME = get_table_name(candle_type)
+    columns = get_columns(TABLE_NAME)[:-1]
+    start = to_utc(start)
+    end = to_utc(end)
+
+    conditions = ['market = :market']
+    params = {'market': market}
+    if start is not None:
+        conditions.append('timestamp_utc >= :start')
+        params['start'] = start
+    if end is not None:
+        conditions.append('timestamp_utc < :end')
+        params['end'] = end
+    limit = ''
+    if count is not None:
+        limit = 'LIMIT :count'
+        params['count'] = count
+
+    query = text(f"""
+        SELECT {', '.join(columns)}
+        FROM {TABLE_NAME}
+        WHERE {' AND '.join(conditions)}
+        ORDER BY timestamp_utc DESC
+        {limit}
+    """)
+    with get_engine().connect() as conn:
+        hot = pd.read_sql(query, conn, params=params)
+
+    # DB 에서 다 채워지면 아카이브는 읽지 않음
+    if count is not None and len(hot) >= count:
+        df = hot
+    else:
+        cold = read_cold(TABLE_NAME, market, start, end, count)
+        if cold is None:
+            df = hot
+        elif hot.empty:
+            df = cold[columns]
+        else:
+            df = pd.concat([hot, cold[columns]], ignore_index=True)
+    df = df.drop_duplicates(subset=['market', 'timestamp_utc'])
+    df = df.sort_values('timestamp_utc')
+    if count is not None:
+        df = df.tail(count)
+    return df.reset_index(drop=True)
+
+def to_utc(value):
+    """
+    timezone 이 없는 datetime 은 UTC 로 간주함
+    """
+    if value is None or value.tzinfo is not None:
+        return value
+    return value.replace(tzinfo=timezone.utc)
@@ -0,0 +1,268 @@
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+from collections import OrderedDict
+from datetime import datetime
+import hashlib
+import io
+import json
+import os
+import select
+import threading
+import time
+import pandas as pd
+import psycopg2
+import pyarrow as pa
+
+from db_engine import DATABASE_URL, CANDLE_NOTIFY_CHANNEL
+from saveprice import get_table_name
+from archive import read_candles
+
+HOST = os.environ.get('CANDLE_SERVER_HOST', '0.0.0.0')
+PORT = int(os.environ.get('CANDLE_SERVER_PORT', '8000'))
+CACHE_MAX_ENTRIES = 1024
+CACHE_TTL = 3600          # 알림이 누락되더라도 이 시간(초)이 지나면 다시 조회함
+DEFAULT_COUNT = 200
+MAX_COUNT = 5000
+
+ARROW_CONTENT_TYPE = 'application/vnd.apache.arrow.stream'
+
+class CandleCache:
+    """
+    (테이블, 마켓, 조회 조건) 단위로 직렬화된 응답을 보관하는 LRU 캐시
+
+    같은 키에 대한 동시 요청은 키별 잠금으로 묶어서 DB 조회를 한 번만 수행함
+    """
+    def __init__(self, max_entries=CACHE_MAX_ENTRIES, ttl=CACHE_TTL):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()   # key -> (저장 시각, df, etag, 포맷별 응답 본문)
+        self._lock = threading.Lock()
+        self._key_locks = {}
+        self._generation = 0   # 무효화될 때마다 증가
+
+    def get_or_load(self, key, loader):
+        entry = self._get(key)
+        if entry is not None:
+            return entry
+        with self._key_lock(key):
+            # 기다리는 동안 다른 요청이 채웠을 수 있음
+            entry = self._get(key)
+            if entry is not None:
+                return entry
+            with self._lock:
+                generation = self._generation
+            df = loader()
+            entry = (time.monotonic(), df, make_etag(df), {})
+            with self._lock:
+                # 조회하는 동안 무효화되었다면 오래된 결과일 수 있으므로 저장하지 않음
+                if generation != self._generation:
+                    return entry
+                self._entries[key] = entry
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+            return entry
+
+    def invalidate(self, table=None, market=None):
+        """
+        테이블/마켓에 해당하는 항목을 제거하는 함수, 인자가 없으면 전체를 비움
+        """
+        with self._lock:
+            self._generation += 1
+            if table is None:
+                self._entries.clear()
+                return
+            for key in [k for k in self._entries if k[0] == table and (market is None or k[1] == market)]:
+                del self._entries[key]
+
+    def _get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if time.monotonic() - entry[0] > self.ttl:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def _key_lock(self, key):
+        with self._lock:
+            if len(self._key_locks) > self.max_entries * 2:
+                self._key_locks = {k: v for k, v in self._key_locks.items() if v.locked()}
+            return self._key_locks.setdefault(key, threading.Lock())
+
+cache = CandleCache()
+
+def make_etag(df):
+    """
+    조회 결과 내용으로 ETag 를 만드는 함수
+    """
+    digest = hashlib.sha1(pd.util.hash_pandas_object(df, index=False).values.tobytes())
+    return f'"{digest.hexdigest()}"'
+
+def etag_matches(if_none_match, etag):
+    """
+    If-None-Match 헤더에 etag 가 있는지 확인하는 함수
+
+    압축하는 프록시(nginx gzip 등)를 거치면 ETag 가 W/"..." 로 바뀌므로 약한 비교(W/ 무시)를 사용하고
+    '*' 는 항상 일치로 봄
+    """
+    for tag in if_none_match.split(','):
+        tag = tag.strip()
+        if tag == '*':
+            return True
+        if tag.startswith('W/'):
+            tag = tag[2:]
+        if tag == etag:
+            return True
+    return False
+
+def query_candles(market, candle_type, start=None, end=None, count=DEFAULT_COUNT):
+    """
+    DB와 아카이브에서 캔들 데이터를 조회하는 함수 (start/end 가 없으면 최근 count 개)
+
+    Args:
+        market (str): 마켓 코드 (예: 'KRW-BTC')
+        candle_type (str): 캔들 타입 ('day', '1min', '3min', '5min', '10min', '30min', '1hour')
+        start (datetime): 조회 시작 시점 (UTC, 포함)
+        end (datetime): 조회 종료 시점 (UTC, 미포함)
+        count (int): 최대 캔들 개수
+
+    Returns:
+        DataFrame: 시간순 정렬된 캔들 데이터
+    """
+    df = read_candles(market, candle_type, start, end, count)
+    for col in df.columns[3:]:
+        df[col] = df[col].astype(float)
+    return df
+
+def to_json_bytes(df):
+    return df.to_json(orient='records', date_format='iso').encode('utf-8')
+
+def to_arrow_bytes(df):
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    sink = io.BytesIO()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue()
+
+def listen_for_updates():
+    """
+    캔들 저장 알림(LISTEN/NOTIFY)을 받아서 캐시를 비우는 함수 (백그라운드 스레드에서 실행)
+    """
+    while True:
+        conn = None
+        try:
+            # 알림 수신용 연결은 풀과 별도로 하나만 유지
+            conn = psycopg2.connect(DATABASE_URL)
+            conn.autocommit = True
+            with conn.cursor() as cur:
+                cur.execute(f"LISTEN {CANDLE_NOTIFY_CHANNEL}")
+            # 연결이 끊긴 동안 놓친 알림이 있을 수 있으므로 전체를 비움
+            cache.invalidate()
+            while True:
+                if select.select([conn], [], [], 60) == ([], [], []):
+                    continue
+                conn.poll()
+                while conn.notifies:
+                    notify = conn.notifies.pop(0)
+                    table, _, market = notify.payload.partition(':')
+                    cache.invalidate(table, market or None)
+        except Exception as e:
+            print(f"캔들 알림 수신 중 오류 발생: {e}")
+            if conn is not None:
+                try:
+                    conn.close()
+                except Exception:
+                    pass
+            time.sleep(5)
+
+def parse_time(value):
+    if value is None:
+        return None
+    return datetime.fromisoformat(value)
+
+class CandleRequestHandler(BaseHTTPRequestHandler):
+    """
+    GET /candles?market=KRW-BTC&interval=1hour[&start=...][&end=...][&count=200][&format=json|arrow]
+    """
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path == '/health':
+            self._send(200, b'{"status": "ok"}', 'application/json')
+            return
+        if url.path != '/candles':
+            self._send_error(404, "not found")
+            return
+
+        query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        try:
+            market = query['market']
+            candle_type = query.get('interval', '1hour')
+            get_table_name(candle_type)
+            start = parse_time(query.get('start'))
+            end = parse_time(query.get('end'))
+            count = min(int(query.get('count', DEFAULT_COUNT)), MAX_COUNT)
+            if count < 1:
+                raise ValueError(f"count 는 1 이상이어야 합니다: {count}")
+        except KeyError as e:
+            self._send_error(400, f"필수 파라미터가 없습니다: {e}")
+            return
+        except ValueError as e:
+            self._send_error(400, str(e))
+            return
+
+        fmt = query.get('format')
+        if fmt is None:
+            fmt = 'arrow' if ARROW_CONTENT_TYPE in self.headers.get('Accept', '') else 'json'
+        if fmt not in ('json', 'arrow'):
+            self._send_error(400, f"지원하지 않는 포맷: {fmt}")
+            return
+
+        key = (get_table_name(candle_type), market, candle_type, start, end, count)
+        try:
+            _, df, etag, bodies = cache.get_or_load(key, lambda: query_candles(market, candle_type, start, end, count))
+        except Exception as e:
+            print(f"캔들 조회 중 오류 발생: {e}")
+            self._send_error(500, "캔들 조회 실패")
+            return
+
+        # 같은 데이터라도 포맷별로 응답 본문이 다르므로 ETag 에 포맷을 붙임
+        etag = f'{etag[:-1]}-{fmt}"'
+        if etag_matches(self.headers.get('If-None-Match', ''), etag):
+            self._send(304, b'', None, etag)
+            return
+
+        # 직렬화 결과도 캐시 항목에 보관해서 반복 요청 시 다시 만들지 않음
+        body = bodies.get(fmt)
+        if body is None:
+            body = bodies[fmt] = to_arrow_bytes(df) if fmt == 'arrow' else to_json_bytes(df)
+        self._send(200, body, ARROW_CONTENT_TYPE if fmt == 'arrow' else 'application/json', etag)
+
+    def _send(self, status, body, content_type, etag=None):
+        self.send_response(status)
+        if content_type is not None:
+            self.send_header('Content-Type', content_type)
+        if etag is not None:
+            self.send_header('ETag', etag)
+            self.send_header('Cache-Control', 'no-cache')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_error(self, status, message):
+        self._send(status, json.dumps({'error': message}, ensure_ascii=False).encode('utf-8'), 'application/json')
+
+    def log_message(self, format, *args):
+        pass
+
+def main(debug=True):
+    threading.Thread(target=listen_for_updates, daemon=True).start()
+    server = ThreadingHTTPServer((HOST, PORT), CandleRequestHandler)
+    if debug:
+        print(f"================= {datetime.now()} 캔들 조회 서비스 시작: {HOST}:{PORT}")
+    server.serve_forever()
+
+if __name__ == "__main__":
+    main(debug=True)
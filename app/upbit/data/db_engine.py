@@ -0,0 +1,46 @@
+from sqlalchemy import create_engine
+import os
+
+
+# 개발 환경에서는 dotenv 사용
+try:
+    from dotenv import load_dotenv
+    load_dotenv()
+    #print("개발 환경: .env 파일을 로드했습니다.")
+except ImportError:
+    #print("Docker 환경: 환경변수를 직접 사용합니다.")
+    pass
+
+# 환경변수 가져오기 (개발환경의 .env 파일 또는 Docker의 환경변수)
+try:
+    # os.environ.get() 대신 직접 접근
+    DB_USER = os.environ['POSTGRES_USER']
+    DB_PASSWORD = os.environ['POSTGRES_PASSWORD']
+    DB_NAME = os.environ['POSTGRES_DB']
+    DB_HOST = os.environ['DB_HOST']
+    DB_PORT = os.environ['DB_PORT']
+
+except KeyError as e:
+    for key in os.environ:
+        if 'POSTGRES' in key or 'DB_' in key:
+            print(f"{key}: {os.environ[key]}")
+    raise ValueError(f"필수 환경변수가 설정되지 않았습니다: {e}")
+
+# 캔들 저장 시 알림을 보내는 채널 (payload: '<테이블>:<마켓>')
+CANDLE_NOTIFY_CHANNEL = 'upbit_candles'
+
+DATABASE_URL = f"postgresql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
+
+_engine = None
+
+def get_engine():
+    """
+    프로세스 단위로 공유하는 DB 엔진(커넥션 풀)을 반환하는 함수
+
+    Returns:
+        Engine: SQLAlchemy 엔진
+    """
+    global _engine
+    if _engine is None:
+        _engine = create_engine(DATABASE_URL, pool_pre_ping=True)
+    return _engine
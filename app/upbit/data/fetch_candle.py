@@ -1,8 +1,39 @@
 import requests
 from datetime import datetime, timezone
+from time import sleep
 import pytz
 import pandas as pd
 
+# (연결, 응답 읽기) 제한 시간(초), 응답이 멈춘 요청 때문에 워커가 멈추지 않도록 설정
+REQUEST_TIMEOUT = (5, 30)
+# 초당 남은 요청 수가 이 값 이하이면 다음 초까지 쉼
+REMAINING_REQ_MIN = 1
+
+class RateLimitError(Exception):
+    """
+    업비트 API 요청 수 제한(HTTP 429)에 걸렸을 때 발생하는 예외
+    """
+    pass
+
+def wait_for_rate_limit(response):
+    """
+    응답의 Remaining-Req 헤더(예: 'group=candles; min=599; sec=9')를 보고
+    초당 남은 요청 수가 거의 없으면 다음 초까지 기다리는 함수
+
+    요청 수 제한은 IP 단위라 같은 호스트의 워커들이 나눠 쓰므로
+    각자 고정 간격으로 호출하는 대신 서버가 알려주는 남은 요청 수를 기준으로 쉼
+    """
+    remaining = response.headers.get('Remaining-Req')
+    if remaining is None:
+        return
+    fields = dict(item.strip().split('=', 1) for item in remaining.split(';') if '=' in item)
+    try:
+        sec = int(fields['sec'])
+    except (KeyError, ValueError):
+        return
+    if sec <= REMAINING_REQ_MIN:
+        sleep(1)
+
 def fetch_candle_day(market, count=200, time=None):
     """
     업비트에서 일간 캔들 데이터를 가져오는 함수
@@ -15,6 +46,9 @@ def fetch_candle_day(market, count=200, time=None):
     
     Returns:
         DataFrame or None: 성공시 DataFrame, 실패시 None
+
+    Raises:
+        RateLimitError: 요청 수 제한(HTTP 429)에 걸린 경우
     """
     try:
         # count 값 검증
@@ -33,7 +67,10 @@ def fetch_candle_day(market, count=200, time=None):
             params['to'] = time
         
         # API 요청
-        response = requests.get(url, params=params)
+        response = requests.get(url, params=params, timeout=REQUEST_TIMEOUT)
+        wait_for_rate_limit(response)
+        if response.status_code == 429:
+            raise RateLimitError(f"API 요청 수 제한: {market} {time}")
         response.raise_for_status()
         data = response.json()
         
@@ -75,6 +112,8 @@ def fetch_candle_day(market, count=200, time=None):
         
         return df
         
+    except RateLimitError:
+        raise
     except requests.exceptions.RequestException as e:
         print(f"API 요청 실패: {e}")
         return None
@@ -94,6 +133,9 @@ def fetch_candle_min(market, count=200, time=None, candle_type='5min'):
     
     Returns:
         DataFrame or None: 성공시 DataFrame, 실패시 None
+
+    Raises:
+        RateLimitError: 요청 수 제한(HTTP 429)에 걸린 경우
     """
     try:
         # count 값 검증
@@ -122,7 +164,10 @@ def fetch_candle_min(market, count=200, time=None, candle_type='5min'):
             params['to'] = time
         
         # API 요청
-        response = requests.get(url, params=params)
+        response = requests.get(url, params=params, timeout=REQUEST_TIMEOUT)
+        wait_for_rate_limit(response)
+        if response.status_code == 429:
+            raise RateLimitError(f"API 요청 수 제한: {market} {time}")
         response.raise_for_status()
         data = response.json()
         
@@ -161,6 +206,8 @@ def fetch_candle_min(market, count=200, time=None, candle_type='5min'):
         
         return df
         
+    except RateLimitError:
+        raise
     except requests.exceptions.RequestException as e:
         print(f"API 요청 실패: {e}")
         return None
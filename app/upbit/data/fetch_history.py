@@ -1,7 +1,7 @@
 from datetime import datetime, timedelta
 import pandas as pd
 import time
-from fetch_candle import fetch_candle_day, fetch_candle_min
+from fetch_candle import fetch_candle_day, fetch_candle_min, RateLimitError
 
 DELAY = 0.3
 def fetch_historical_data_daily(market, years=3, debug=False):
@@ -161,6 +161,84 @@ def fetch_historical_data_min(market, days=365, candle_type='5min', debug=False)
         print(f"데이터 수집 중 오류 발생: {e}")
         return None
 
+def fetch_range_data(market, start, end, candle_type='1hour', on_batch=None):
+    """
+    [start, end) 구간의 캔들 데이터를 가져오는 함수 (UTC 기준)
+    
+    Args:
+        market (str): 마켓 코드 (예: 'KRW-BTC')
+        start (datetime): 구간 시작 시점 (UTC, 포함)
+        end (datetime): 구간 종료 시점 (UTC, 미포함)
+        candle_type (str): 캔들 타입 ('day', '1min', '3min', '5min', '10min', '30min', '1hour')
+        on_batch (callable): 배치마다 호출되는 콜백, False 를 반환하면 수집을 중단함
+    
+    Returns:
+        DataFrame or None: 성공시 DataFrame (구간에 데이터가 없으면 빈 DataFrame), 실패/중단시 None
+
+    Raises:
+        RateLimitError: 요청 수 제한(HTTP 429)에 걸린 경우
+            이미 가져온 데이터(partial)와 이어서 수집할 구간의 끝(resume_end)을 담아서 발생시킴
+    """
+    all_data = []
+    current_time = end
+    try:
+        while current_time > start:
+            # 데이터 가져오기
+            if candle_type == 'day':
+                df_batch = fetch_candle_day(
+                    market=market,
+                    count=200,
+                    time=current_time.strftime('%Y-%m-%d %H:%M:%S')
+                )
+            else:
+                df_batch = fetch_candle_min(
+                    market=market,
+                    count=200,
+                    time=current_time.strftime('%Y-%m-%d %H:%M:%S'),
+                    candle_type=candle_type
+                )
+            
+            if df_batch is None:
+                print(f"{market} {candle_type} 구간 데이터 가져오기 실패: {current_time}")
+                return None
+            if df_batch.empty:
+                # 상장 이전 구간
+                break
+            
+            # 데이터 저장
+            all_data.append(df_batch)
+            
+            # 다음 배치를 위한 마지막 timestamp 설정
+            current_time = df_batch['timestamp_utc'].min().to_pydatetime()
+            
+            if on_batch is not None and on_batch() is False:
+                return None
+            
+            # API 호출 간격 조절
+            time.sleep(DELAY)
+        
+        return merge_range_batches(all_data, start, end)
+        
+    except RateLimitError as e:
+        # 이미 가져온 [current_time, end) 구간은 버리지 않고 넘겨서 [start, current_time) 만 다시 수집하도록 함
+        e.partial = merge_range_batches(all_data, start, end)
+        e.resume_end = current_time
+        raise
+    except Exception as e:
+        print(f"데이터 수집 중 오류 발생: {e}")
+        return None
+
+def merge_range_batches(all_data, start, end):
+    """
+    배치들을 합쳐서 [start, end) 구간만 남기는 함수 (중복 제거, 시간순 정렬)
+    """
+    if not all_data:
+        return pd.DataFrame()
+    final_df = pd.concat(all_data, ignore_index=True)
+    final_df = final_df[(final_df['timestamp_utc'] >= start) & (final_df['timestamp_utc'] < end)]
+    final_df = final_df.drop_duplicates(subset=['market', 'timestamp_utc'])
+    return final_df.sort_values('timestamp_utc')
+
 if __name__ == "__main__":
     # 테스트: 비트코인 데이터 가져오기
     markets = ["KRW-BTC"]
@@ -0,0 +1,261 @@
+from datetime import datetime, timedelta
+from sqlalchemy import text
+
+from db_engine import get_engine
+
+TABLE_NAME = 'upbit_fetch_job'
+LEASE_SECONDS = 120   # 하트비트 없이 이 시간이 지나면 다른 워커가 작업을 다시 가져감
+MAX_ATTEMPTS = 5      # 이 횟수만큼 실패하면 'failed' 로 남김
+BACKOFF_SECONDS = 30  # 실패 후 재시도 대기 시간, 실패할 때마다 두 배로 늘어남
+BACKOFF_MAX_SECONDS = 3600
+WINDOW_EPOCH = datetime(2017, 1, 1)   # 구간 경계 기준 시점 (UTC)
+
+def split_windows(start, end, window):
+    """
+    [start, end) 구간을 window 크기의 구간 목록으로 나누는 함수
+
+    구간 경계는 WINDOW_EPOCH 기준 격자에 맞추므로 언제 등록하더라도 같은 구간이 만들어짐
+    (start 는 격자에 맞게 내림하고, end 를 넘는 마지막 미완성 구간은 제외함)
+
+    Args:
+        start (datetime): 구간 시작 시점 (UTC)
+        end (datetime): 구간 종료 시점 (UTC)
+        window (timedelta): 구간 크기
+
+    Returns:
+        list: (window_start, window_end) 튜플 목록
+    """
+    windows = []
+    current = WINDOW_EPOCH + ((start - WINDOW_EPOCH) // window) * window
+    while current + window <= end:
+        windows.append((current, current + window))
+        current += window
+    return windows
+
+def enqueue_jobs(markets, candle_type, start, end, window=timedelta(days=7)):
+    """
+    마켓 x 구간 단위의 수집 작업을 큐에 등록하는 함수 (이미 등록된 구간은 무시함)
+
+    Args:
+        markets (list): 마켓 코드 목록 (예: ['KRW-BTC', 'KRW-ETH'])
+        candle_type (str): 캔들 타입 ('day', '1min', '3min', '5min', '10min', '30min', '1hour')
+        start (datetime): 수집 시작 시점 (UTC)
+        end (datetime): 수집 종료 시점 (UTC)
+        window (timedelta): 작업 하나가 담당할 구간 크기 (기본값: 7일)
+
+    Returns:
+        int: 새로 등록된 작업 수
+    """
+    windows = [
+        (market, window_start, window_end)
+        for market in markets
+        for window_start, window_end in split_windows(start, end, window)
+    ]
+    if not windows:
+        return 0
+
+    # 배열로 한 번에 넘겨서 작업 수와 관계없이 쿼리 한 번으로 등록
+    engine = get_engine()
+    with engine.connect() as conn:
+        rows = conn.execute(text(f"""
+            INSERT INTO {TABLE_NAME} (market, candle_type, window_start, window_end)
+            SELECT market, :candle_type, window_start, window_end
+            FROM unnest(CAST(:markets AS varchar[]),
+                        CAST(:window_starts AS timestamp[]),
+                        CAST(:window_ends AS timestamp[]))
+                 AS t(market, window_start, window_end)
+            ON CONFLICT (market, candle_type, window_start, window_end)
+            DO NOTHING
+            RETURNING id
+        """), {
+            'candle_type': candle_type,
+            'markets': [w[0] for w in windows],
+            'window_starts': [w[1] for w in windows],
+            'window_ends': [w[2] for w in windows],
+        }).all()
+        conn.commit()
+    return len(rows)
+
+def claim_job(worker_id, lease_seconds=LEASE_SECONDS):
+    """
+    대기 중인 작업 중 재시도 대기 시간(available_at)이 지난 작업 하나를 가져오는 함수
+
+    FOR UPDATE SKIP LOCKED 로 다른 워커가 잡고 있는 행은 건너뛰므로
+    같은 작업이 동시에 두 워커에 배정되지 않음
+
+    Args:
+        worker_id (str): 워커 식별자
+        lease_seconds (int): 임대 시간(초)
+
+    Returns:
+        dict or None: 작업 정보, 가져올 작업이 없으면 None
+    """
+    engine = get_engine()
+    with engine.connect() as conn:
+        row = conn.execute(text(f"""
+            UPDATE {TABLE_NAME}
+            SET status = 'running',
+                worker_id = :worker_id,
+                lease_until = now() + make_interval(secs => :lease_seconds),
+                heartbeat_at = now(),
+                attempts = attempts + 1,
+                updated_at = now()
+            WHERE id = (
+                SELECT id FROM {TABLE_NAME}
+                WHERE status = 'pending' AND available_at <= now()
+                ORDER BY window_start DESC, id
+                LIMIT 1
+                FOR UPDATE SKIP LOCKED
+            )
+            RETURNING id, market, candle_type, window_start, window_end, resume_end, attempts
+        """), {
+            'worker_id': worker_id,
+            'lease_seconds': lease_seconds,
+        }).mappings().first()
+        conn.commit()
+    return dict(row) if row is not None else None
+
+def reclaim_expired_jobs():
+    """
+    임대가 만료된(하트비트가 끊긴) 작업을 다시 대기 상태로 돌려놓는 함수
+    재시도 횟수를 모두 쓴 작업은 'failed' 로 남김
+
+    Returns:
+        int: 되돌린 작업 수
+    """
+    engine = get_engine()
+    with engine.connect() as conn:
+        result = conn.execute(text(f"""
+            UPDATE {TABLE_NAME}
+            SET status = CASE WHEN attempts >= :max_attempts THEN 'failed' ELSE 'pending' END,
+                lease_until = NULL,
+                last_error = '임대 만료',
+                updated_at = now()
+            WHERE status = 'running' AND lease_until < now()
+        """), {'max_attempts': MAX_ATTEMPTS})
+        conn.commit()
+    return result.rowcount
+
+def heartbeat_job(job_id, worker_id, lease_seconds=LEASE_SECONDS):
+    """
+    작업 임대를 연장하는 함수
+
+    Returns:
+        bool: 연장 성공 여부, 임대가 만료되어 다른 워커가 가져간 경우 False
+    """
+    engine = get_engine()
+    with engine.connect() as conn:
+        result = conn.execute(text(f"""
+            UPDATE {TABLE_NAME}
+            SET lease_until = now() + make_interval(secs => :lease_seconds),
+                heartbeat_at = now(),
+                updated_at = now()
+            WHERE id = :job_id AND worker_id = :worker_id AND status = 'running'
+        """), {'job_id': job_id, 'worker_id': worker_id, 'lease_seconds': lease_seconds})
+        conn.commit()
+    return result.rowcount == 1
+
+def complete_job(job_id, worker_id):
+    """
+    작업을 완료 처리하는 함수
+
+    Returns:
+        bool: 완료 처리 성공 여부
+    """
+    engine = get_engine()
+    with engine.connect() as conn:
+        result = conn.execute(text(f"""
+            UPDATE {TABLE_NAME}
+            SET status = 'done', lease_until = NULL, last_error = NULL, updated_at = now()
+            WHERE id = :job_id AND worker_id = :worker_id AND status = 'running'
+        """), {'job_id': job_id, 'worker_id': worker_id})
+        conn.commit()
+    return result.rowcount == 1
+
+def fail_job(job_id, worker_id, error):
+    """
+    작업을 실패 처리하는 함수, 재시도 횟수가 남아 있으면 다시 대기 상태로 돌려놓음
+    재시도는 BACKOFF_SECONDS * 2^(시도 횟수 - 1) 초 뒤부터 가능함 (최대 BACKOFF_MAX_SECONDS)
+
+    Returns:
+        bool: 실패 처리 성공 여부
+    """
+    engine = get_engine()
+    with engine.connect() as conn:
+        result = conn.execute(text(f"""
+            UPDATE {TABLE_NAME}
+            SET status = CASE WHEN attempts >= :max_attempts THEN 'failed' ELSE 'pending' END,
+                lease_until = NULL,
+                last_error = :error,
+                available_at = now() + make_interval(
+                    secs => least(:backoff * power(2, attempts - 1), :backoff_max)),
+                updated_at = now()
+            WHERE id = :job_id AND worker_id = :worker_id AND status = 'running'
+        """), {
+            'job_id': job_id,
+            'worker_id': worker_id,
+            'error': str(error),
+            'max_attempts': MAX_ATTEMPTS,
+            'backoff': BACKOFF_SECONDS,
+            'backoff_max': BACKOFF_MAX_SECONDS,
+        })
+        conn.commit()
+    return result.rowcount == 1
+
+def retry_job(job_id, worker_id, delay, error, resume_end=None):
+    """
+    작업을 시도 횟수에 포함하지 않고 delay 초 뒤에 다시 가져가도록 돌려놓는 함수
+    (요청 수 제한처럼 작업 자체의 문제가 아닌 경우)
+    resume_end 가 있으면 다음에는 [window_start, resume_end) 구간만 수집함
+
+    Returns:
+        bool: 처리 성공 여부
+    """
+    engine = get_engine()
+    with engine.connect() as conn:
+        result = conn.execute(text(f"""
+            UPDATE {TABLE_NAME}
+            SET status = 'pending',
+                attempts = greatest(attempts - 1, 0),
+                lease_until = NULL,
+                last_error = :error,
+                available_at = now() + make_interval(secs => :delay),
+                resume_end = coalesce(:resume_end, resume_end),
+                updated_at = now()
+            WHERE id = :job_id AND worker_id = :worker_id AND status = 'running'
+        """), {
+            'job_id': job_id,
+            'worker_id': worker_id,
+            'delay': delay,
+            'error': str(error),
+            'resume_end': resume_end,
+        })
+        conn.commit()
+    return result.rowcount == 1
+
+def has_waiting_jobs():
+    """
+    아직 끝나지 않은 작업('pending' 또는 'running')이 있는지 확인하는 함수
+
+    Returns:
+        bool: 남은 작업 존재 여부
+    """
+    engine = get_engine()
+    with engine.connect() as conn:
+        return conn.execute(text(f"""
+            SELECT EXISTS (SELECT 1 FROM {TABLE_NAME} WHERE status IN ('pending', 'running'))
+        """)).scalar()
+
+def count_jobs():
+    """
+    상태별 작업 수를 반환하는 함수
+
+    Returns:
+        dict: {status: count}
+    """
+    engine = get_engine()
+    with engine.connect() as conn:
+        rows = conn.execute(text(f"""
+            SELECT status, count(*) FROM {TABLE_NAME} GROUP BY status
+        """)).all()
+    return {status: count for status, count in rows}
@@ -0,0 +1,175 @@
+import json
+import os
+import numpy as np
+
+from archive import read_candles, to_utc
+
+FIELDS = ['open', 'high', 'low', 'close', 'volume', 'trade_price']
+
+class CandleReplay:
+    """
+    여러 마켓의 캔들을 시간 x 마켓으로 정렬한 연속 NumPy 배열
+
+    data 는 (필드, 시간, 마켓) 모양의 C-contiguous 배열이라
+    필드 하나를 꺼내면 (시간, 마켓) 연속 블록이 되고, 시간 구간 슬라이싱은 복사 없이 view 로 처리됨
+    캔들이 없는 칸은 NaN
+
+    Attributes:
+        times (ndarray): (시간,) int64 UTC epoch 나노초, 오름차순
+        markets (list): 마켓 코드 목록 (열 순서)
+        fields (list): 필드 이름 목록
+        data (ndarray): (필드, 시간, 마켓) 배열
+    """
+    def __init__(self, times, markets, fields, data):
+        self.times = times
+        self.markets = list(markets)
+        self.fields = list(fields)
+        self.data = data
+
+    def __len__(self):
+        return len(self.times)
+
+    def __getitem__(self, field):
+        """
+        필드 하나의 (시간, 마켓) view
+        """
+        return self.data[self.fields.index(field)]
+
+    def iter_batches(self, batch_size=4096):
+        """
+        시간순으로 batch_size 개씩 (times, data) view 를 반환하는 제너레이터
+
+        Yields:
+            tuple: ((배치,) times, (필드, 배치, 마켓) data)
+        """
+        for i in range(0, len(self.times), batch_size):
+            yield self.times[i:i + batch_size], self.data[:, i:i + batch_size]
+
+    def window(self, index, length):
+        """
+        index 시점까지(포함) 최근 length 개 시간의 (필드, length, 마켓) view
+        """
+        if not 0 <= index < len(self.times):
+            raise IndexError(f"index {index} 가 범위(0 ~ {len(self.times) - 1})를 벗어났습니다")
+        if index + 1 < length:
+            raise ValueError(f"index {index} 이전 데이터가 {length}개보다 적습니다")
+        return self.data[:, index + 1 - length:index + 1]
+
+    def sliding_windows(self, length):
+        """
+        모든 시점의 최근 length 개 구간을 한 번에 담은 (필드, 시간 - length + 1, 마켓, length) view (복사 없음)
+        """
+        return np.lib.stride_tricks.sliding_window_view(self.data, length, axis=1)
+
+    def save(self, path, params=None):
+        """
+        메모리 매핑으로 다시 열 수 있도록 디렉토리에 .npy 파일로 저장하는 함수
+
+        params 는 meta.json 에 같이 저장해서 캐시가 어떤 조회 조건으로 만들어졌는지 확인하는 데 사용함
+        기존 파일을 메모리 매핑으로 열고 있는 프로세스가 있을 수 있으므로 임시 파일에 쓴 뒤 이름을 바꿈
+        """
+        os.makedirs(path, exist_ok=True)
+        for name, array in (('times.npy', self.times), ('data.npy', self.data)):
+            temp_path = os.path.join(path, f"{name}.tmp")
+            with open(temp_path, 'wb') as f:
+                np.save(f, array)
+            os.replace(temp_path, os.path.join(path, name))
+        # meta.json 을 마지막에 바꿔서, 중간에 실패하면 조건이 맞지 않아 다시 만들어지도록 함
+        temp_path = os.path.join(path, 'meta.json.tmp')
+        with open(temp_path, 'w') as f:
+            json.dump({'markets': self.markets, 'fields': self.fields, 'params': params}, f)
+        os.replace(temp_path, os.path.join(path, 'meta.json'))
+
+    @classmethod
+    def load(cls, path, mmap_mode='r'):
+        """
+        save 로 저장한 디렉토리를 여는 함수 (기본값은 읽기 전용 메모리 매핑)
+        """
+        with open(os.path.join(path, 'meta.json')) as f:
+            meta = json.load(f)
+        times = np.load(os.path.join(path, 'times.npy'), mmap_mode=mmap_mode)
+        data = np.load(os.path.join(path, 'data.npy'), mmap_mode=mmap_mode)
+        return cls(times, meta['markets'], meta['fields'], data)
+
+def get_cache_params(markets, candle_type, start, end, fields, dtype):
+    """
+    캐시 확인용 조회 조건 (meta.json 에 저장되는 형태)
+    """
+    start = to_utc(start)
+    end = to_utc(end)
+    return {
+        'markets': list(markets),
+        'candle_type': candle_type,
+        'start': start.isoformat() if start is not None else None,
+        'end': end.isoformat() if end is not None else None,
+        'fields': list(fields),
+        'dtype': np.dtype(dtype).str,
+    }
+
+def read_cache_params(path):
+    """
+    캐시 디렉토리에 저장된 조회 조건, 캐시가 없으면 None
+    """
+    meta_path = os.path.join(path, 'meta.json')
+    if not os.path.exists(meta_path):
+        return None
+    with open(meta_path) as f:
+        return json.load(f).get('params')
+
+def load_replay(markets, candle_type, start=None, end=None, fields=FIELDS, dtype=np.float64, cache_path=None):
+    """
+    DB와 아카이브에서 캔들을 읽어 CandleReplay 로 만드는 함수
+
+    cache_path 가 있으면 처음 한 번만 DB에서 읽어 저장하고, 이후에는 메모리 매핑으로 바로 엶
+    저장된 조회 조건(meta.json)이 인자와 다르면 DB에서 다시 읽어 캐시를 덮어씀
+    (end 가 없으면 캐시를 만든 뒤에 저장된 캔들은 포함되지 않음)
+
+    Args:
+        markets (list): 마켓 코드 목록 (예: ['KRW-BTC', 'KRW-ETH'])
+        candle_type (str): 캔들 타입 ('day', '1min', '3min', '5min', '10min', '30min', '1hour')
+        start (datetime): 조회 시작 시점 (UTC, 포함)
+        end (datetime): 조회 종료 시점 (UTC, 미포함)
+        fields (list): 가져올 필드 목록 (기본값: FIELDS)
+        dtype: 배열 자료형, 빈 칸을 NaN 으로 채우므로 실수형만 가능 (기본값: float64)
+        cache_path (str): 캐시 디렉토리 경로
+
+    Returns:
+        CandleReplay
+
+    Raises:
+        ValueError: dtype 이 실수형이 아닌 경우
+    """
+    if not np.issubdtype(dtype, np.floating):
+        raise ValueError(f"dtype 은 실수형이어야 합니다 (캔들이 없는 칸을 NaN 으로 채움): {np.dtype(dtype)}")
+    params = get_cache_params(markets, candle_type, start, end, fields, dtype)
+    if cache_path is not None and read_cache_params(cache_path) == params:
+        return CandleReplay.load(cache_path)
+
+    # 마켓별로 읽어서 (timestamp, 필드 배열) 로 변환
+    columns = []
+    for market in markets:
+        df = read_candles(market, candle_type, start, end)
+        if df.empty:
+            columns.append((np.empty(0, dtype=np.int64), np.empty((len(fields), 0), dtype=dtype)))
+            continue
+        timestamps = df['timestamp_utc'].dt.tz_convert('UTC').dt.tz_localize(None)
+        market_times = timestamps.to_numpy(dtype='datetime64[ns]').view(np.int64)
+        values = np.empty((len(fields), len(df)), dtype=dtype)
+        for i, field in enumerate(fields):
+            values[i] = df[field].to_numpy(dtype=dtype)
+        columns.append((market_times, values))
+
+    # 전체 시점을 합친 뒤 마켓별 위치에 채워넣음
+    if columns:
+        times = np.unique(np.concatenate([market_times for market_times, _ in columns]))
+    else:
+        times = np.empty(0, dtype=np.int64)
+    data = np.full((len(fields), len(times), len(markets)), np.nan, dtype=dtype)
+    for j, (market_times, values) in enumerate(columns):
+        data[:, np.searchsorted(times, market_times), j] = values
+
+    replay = CandleReplay(times, markets, fields, data)
+    if cache_path is not None:
+        replay.save(cache_path, params)
+        return CandleReplay.load(cache_path)
+    return replay
@@ -0,0 +1,63 @@
+"""
+오래된 캔들을 Parquet 아카이브로 옮기고 DB에서 삭제하는 스크립트 (cron 으로 매일 실행)
+
+일반 VACUUM 은 삭제된 행의 공간을 테이블 안에서 재사용할 수 있게 표시만 하고
+디스크의 테이블 파일 크기는 줄이지 않음 (pg_dump 백업 크기만 줄어듦)
+처음 적용해서 오래된 캔들이 한꺼번에 빠질 때는 한 번만 아래처럼 실행해서 파일 크기를 줄임:
+    python -m run_archive --vacuum-full
+VACUUM FULL 은 테이블을 새로 쓰는 동안 ACCESS EXCLUSIVE 잠금을 잡아서 수집/조회가 모두 멈추므로
+수집 cron 이 돌지 않는 시간에 실행하거나, 잠금 없이 줄이려면 pg_repack 을 사용:
+    pg_repack -t upbit_minute_price -t upbit_1hour_price <DB 이름>
+"""
+from archive import archive_table
+from db_engine import get_engine
+from saveprice import get_table_name
+from sqlalchemy import text
+from datetime import datetime
+import sys
+# 캔들 타입별로 DB에 남겨둘 기간(일), None 이면 보관하지 않음
+ARCHIVE_AGE_DAYS = {
+    '1min': 30,
+    '1hour': 365,
+    'day': None,
+}
+
+def table_exists(conn, table_name):
+    return conn.execute(text("SELECT to_regclass(:table)"), {'table': table_name}).scalar() is not None
+
+def get_table_size(conn, table_name):
+    return conn.execute(text("SELECT pg_total_relation_size(:table)"), {'table': table_name}).scalar()
+
+def main(debug=True, vacuum_full=False):
+    if debug:
+        print(f"================= {datetime.now()} 캔들 아카이브 시작")
+    engine = get_engine()
+    for candle_type, age_days in ARCHIVE_AGE_DAYS.items():
+        if age_days is None:
+            continue
+        TABLE_NAME = get_table_name(candle_type)
+        # 분봉 테이블처럼 만들지 않은 테이블은 건너뜀
+        with engine.connect() as conn:
+            if not table_exists(conn, TABLE_NAME):
+                continue
+        count = archive_table(candle_type, age_days, debug=debug)
+        if debug:
+            print(f"{candle_type} {age_days}일 이전 캔들 {count}개 보관")
+        if count == 0 and not vacuum_full:
+            continue
+        with engine.connect().execution_options(isolation_level='AUTOCOMMIT') as conn:
+            before = get_table_size(conn, TABLE_NAME)
+            if vacuum_full:
+                # 테이블을 새로 써서 파일 크기를 줄임 (실행 중에는 테이블 잠김)
+                conn.execute(text(f"VACUUM FULL ANALYZE {TABLE_NAME}"))
+            else:
+                # 삭제된 행의 공간을 재사용할 수 있도록 정리 (파일 크기는 그대로)
+                conn.execute(text(f"VACUUM ANALYZE {TABLE_NAME}"))
+            after = get_table_size(conn, TABLE_NAME)
+        if debug:
+            print(f"{TABLE_NAME} 크기 {before / 1024 ** 2:.1f}MB -> {after / 1024 ** 2:.1f}MB")
+    if debug:
+        print(f"================= {datetime.now()} 캔들 아카이브 완료")
+
+if __name__ == "__main__":
+    main(debug=True, vacuum_full='--vacuum-full' in sys.argv[1:])
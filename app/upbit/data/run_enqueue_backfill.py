@@ -0,0 +1,18 @@
+from job_queue import enqueue_jobs, count_jobs
+from datetime import datetime, timedelta, timezone
+MARKETS = ["KRW-BTC", "KRW-ETH", "KRW-XRP"]
+CANDLE_TYPE = '1hour'
+DAYS = 365 * 3
+WINDOW = timedelta(days=7)   # 1hour 기준 작업 하나당 168개 = API 호출 1번
+
+def main(debug=True):
+    # 현재 시각 기준 최근 DAYS 일을 WINDOW 단위로 나누어 등록 (UTC)
+    end = datetime.now(timezone.utc).replace(tzinfo=None)
+    start = end - timedelta(days=DAYS)
+    count = enqueue_jobs(MARKETS, CANDLE_TYPE, start, end, window=WINDOW)
+    if debug:
+        print(f"================= {datetime.now()} 수집 작업 {count}개 등록")
+        print(count_jobs())
+
+if __name__ == "__main__":
+    main(debug=True)
@@ -0,0 +1,103 @@
+from job_queue import claim_job, reclaim_expired_jobs, heartbeat_job, complete_job, fail_job, retry_job, has_waiting_jobs, LEASE_SECONDS
+from saveprice import save_range_price
+from fetch_candle import RateLimitError
+from datetime import datetime
+import os
+import socket
+import time
+
+WORKER_ID = os.environ.get('WORKER_ID', f"{socket.gethostname()}-{os.getpid()}")
+HEARTBEAT_INTERVAL = LEASE_SECONDS / 4   # 임대 시간 안에 여러 번 연장되도록 설정
+IDLE_SLEEP = float(os.environ.get('IDLE_SLEEP', '10'))   # 가져올 작업이 없을 때 대기 시간(초)
+RATE_LIMIT_DELAY = 10                    # 요청 수 제한에 걸린 작업을 다시 가져가기까지 대기 시간(초)
+RATE_LIMIT_SLEEP = 1                     # 요청 수 제한에 걸린 뒤 워커가 쉬는 시간(초), 연속으로 걸리면 두 배씩 늘림
+RATE_LIMIT_SLEEP_MAX = 60
+ERROR_SLEEP = 30                         # DB 오류 등으로 작업을 가져오지 못했을 때 대기 시간(초)
+
+def run_job(job, debug=True):
+    """
+    작업 하나를 수행하는 함수
+
+    수집 중 배치마다 임대를 연장하고, 임대를 잃으면(다른 워커가 가져감) 저장하지 않고 중단함
+    요청 수 제한(HTTP 429)은 시도 횟수에 포함하지 않고 잠시 뒤 다시 가져가도록 돌려놓음
+    (그 전까지 가져온 구간은 저장되므로 다음에는 남은 구간만 수집함)
+
+    Returns:
+        bool: 요청 수 제한에 걸렸으면 True
+    """
+    last_heartbeat = time.monotonic()
+    lease_lost = False
+
+    def on_batch():
+        nonlocal last_heartbeat, lease_lost
+        if time.monotonic() - last_heartbeat < HEARTBEAT_INTERVAL:
+            return True
+        if not heartbeat_job(job['id'], WORKER_ID):
+            lease_lost = True
+            return False
+        last_heartbeat = time.monotonic()
+        return True
+
+    try:
+        success = save_range_price(
+            job['market'],
+            job['window_start'],
+            job['resume_end'] or job['window_end'],
+            candle_type=job['candle_type'],
+            on_batch=on_batch
+        )
+    except RateLimitError as e:
+        if debug:
+            print(f"{WORKER_ID} 작업 {job['id']} 요청 수 제한으로 {RATE_LIMIT_DELAY}초 뒤 재시도")
+        retry_job(job['id'], WORKER_ID, RATE_LIMIT_DELAY, e, resume_end=getattr(e, 'resume_end', None))
+        return True
+    except Exception as e:
+        fail_job(job['id'], WORKER_ID, e)
+        return False
+
+    if lease_lost:
+        if debug:
+            print(f"{WORKER_ID} 작업 {job['id']} 임대 만료로 중단")
+        return False
+    if success:
+        complete_job(job['id'], WORKER_ID)
+    else:
+        fail_job(job['id'], WORKER_ID, "데이터 저장 실패")
+    return False
+
+def main(debug=True, exit_when_idle=False):
+    """
+    작업 큐에서 (market, candle_type, 구간) 작업을 가져와 수집하는 워커
+
+    여러 프로세스/컨테이너에서 동시에 실행해도 같은 구간을 중복으로 가져가지 않음
+    """
+    if debug:
+        print(f"================= {datetime.now()} 워커 {WORKER_ID} 시작")
+    rate_limit_sleep = RATE_LIMIT_SLEEP
+    while True:
+        try:
+            reclaim_expired_jobs()
+            job = claim_job(WORKER_ID)
+            if job is None:
+                if exit_when_idle and not has_waiting_jobs():
+                    break
+                time.sleep(IDLE_SLEEP)
+                continue
+            if debug:
+                print(f"{WORKER_ID} 작업 {job['id']} 시작: {job['market']} {job['candle_type']} "
+                      f"{job['window_start']} ~ {job['resume_end'] or job['window_end']} (시도 {job['attempts']})")
+            if run_job(job, debug=debug):
+                # 같은 IP 의 다른 워커들과 요청 수를 나눠 쓰므로 연속으로 걸리면 점점 오래 쉼
+                time.sleep(rate_limit_sleep)
+                rate_limit_sleep = min(rate_limit_sleep * 2, RATE_LIMIT_SLEEP_MAX)
+            else:
+                rate_limit_sleep = RATE_LIMIT_SLEEP
+        except Exception as e:
+            # DB 연결이 끊기는 등의 오류로 워커가 종료되지 않도록 잠시 쉬고 다시 시도
+            print(f"{WORKER_ID} 작업 처리 중 오류 발생: {e}")
+            time.sleep(ERROR_SLEEP)
+    if debug:
+        print(f"================= {datetime.now()} 워커 {WORKER_ID} 종료")
+
+if __name__ == "__main__":
+    main(debug=True, exit_when_idle=os.environ.get('EXIT_WHEN_IDLE') == '1')
@@ -1,34 +1,83 @@
 from datetime import datetime
 import pandas as pd
-from sqlalchemy import create_engine, text, String, DateTime, Numeric
-import os
-
-
-# 개발 환경에서는 dotenv 사용
-try:
-    from dotenv import load_dotenv
-    load_dotenv()
-    #print("개발 환경: .env 파일을 로드했습니다.")
-except ImportError:
-    #print("Docker 환경: 환경변수를 직접 사용합니다.")
-    pass
-
-# 환경변수 가져오기 (개발환경의 .env 파일 또는 Docker의 환경변수)
-try:
-    # os.environ.get() 대신 직접 접근
-    DB_USER = os.environ['POSTGRES_USER']
-    DB_PASSWORD = os.environ['POSTGRES_PASSWORD']
-    DB_NAME = os.environ['POSTGRES_DB']
-    DB_HOST = os.environ['DB_HOST']
-    DB_PORT = os.environ['DB_PORT']
-
-except KeyError as e:
-    for key in os.environ:
-        if 'POSTGRES' in key or 'DB_' in key:
-            print(f"{key}: {os.environ[key]}")
-    raise ValueError(f"필수 환경변수가 설정되지 않았습니다: {e}")
-
-from fetch_history import fetch_historical_data_daily, fetch_historical_data_min
+from sqlalchemy import text
+
+from db_engine import get_engine, CANDLE_NOTIFY_CHANNEL
+from fetch_candle import RateLimitError
+from fetch_history import fetch_historical_data_daily, fetch_historical_data_min, fetch_range_data
+
+def get_table_name(candle_type):
+    """
+    캔들 타입에 해당하는 테이블 이름을 반환하는 함수
+
+    Args:
+        candle_type (str): 캔들 타입 ('day', '1min', '3min', '5min', '10min', '30min', '1hour')
+    """
+    if candle_type == 'day':
+        return 'upbit_daily_price'
+    elif candle_type == '1hour':
+        return 'upbit_1hour_price'
+    elif candle_type in ['1min', '3min', '5min', '10min', '30min']:
+        return 'upbit_minute_price'
+    else:
+        raise ValueError(f"지원하지 않는 캔들 유형: {candle_type}")
+
+def save_candles(df, market, candle_type):
+    """
+    캔들 DataFrame 을 DB에 저장하는 함수 (이미 있는 캔들은 무시함)
+
+    Args:
+        df (DataFrame): fetch_candle 형식의 캔들 데이터
+        market (str): 마켓 코드 (예: 'KRW-BTC')
+        candle_type (str): 캔들 타입 ('day', '1min', '3min', '5min', '10min', '30min', '1hour')
+    """
+    TABLE_NAME = get_table_name(candle_type)
+
+    # created_at 컬럼 추가
+    df = df.copy()
+    df['created_at'] = datetime.now()
+
+    # 데이터 타입 변환
+    numeric_columns = ['open', 'high', 'low', 'close', 'volume', 'trade_price']
+    if candle_type == 'day':
+        numeric_columns.append('change_rate')
+    for col in numeric_columns:
+        df[col] = pd.to_numeric(df[col], errors='coerce')
+
+    columns = ', '.join(['market', 'timestamp_utc', 'timestamp_kst'] + numeric_columns + ['created_at'])
+
+    # DB 연결
+    engine = get_engine()
+
+    # 세션 전용 임시 테이블에 데이터를 올린 뒤 같은 연결(트랜잭션)에서 옮겨 담음
+    # 임시 테이블은 다른 연결에서 보이지 않고 커밋 시 삭제되므로 여러 워커가 동시에 저장해도 겹치지 않음
+    with engine.connect() as conn:
+        conn.execute(text(f"""
+            CREATE TEMPORARY TABLE temp_candles ON COMMIT DROP AS
+            SELECT {columns} FROM {TABLE_NAME} WITH NO DATA
+        """))
+        df.to_sql('temp_candles', conn, if_exists='append', index=False)
+
+        # INSERT IGNORE 패턴으로 데이터 저장
+        # 새로 저장된 캔들이 있으면 조회 서비스 캐시가 갱신되도록 알림을 보냄 (커밋 시 전달됨)
+        insert_query = text(f"""
+            WITH inserted AS (
+                INSERT INTO {TABLE_NAME} ({columns})
+                SELECT {columns}
+                FROM temp_candles
+                ON CONFLICT (market, timestamp_utc)
+                DO NOTHING
+                RETURNING 1
+            )
+            SELECT pg_notify(:channel, :payload)
+            WHERE EXISTS (SELECT 1 FROM inserted)
+        """)
+
+        result = conn.execute(insert_query, {
+            'channel': CANDLE_NOTIFY_CHANNEL,
+            'payload': f"{TABLE_NAME}:{market}",
+        })
+        conn.commit()
 
 def save_daily_price(market,year=3):
     """
@@ -43,69 +92,14 @@ def save_daily_price(market,year=3):
         df = fetch_historical_data_daily(market, year)
         if df is None:
             return False
-            
-        # created_at 컬럼 추가
-        df['created_at'] = datetime.now()
-        
-        # 데이터 타입 변환
-        numeric_columns = ['open', 'high', 'low', 'close', 'volume', 'trade_price', 'change_rate']
-        for col in numeric_columns:
-            df[col] = pd.to_numeric(df[col], errors='coerce')
-        
-        # DB 연결
-        DATABASE_URL = f"postgresql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
-        engine = create_engine(DATABASE_URL)
-        
-        # 임시 테이블에 데이터 저장
-        timestamp_suffix = datetime.now().strftime('%Y%m%d_%H%M%S')
-        temp_table = f"temp_{market.replace('-', '_').lower()}_{timestamp_suffix}"
-        
-        # 기존 임시 테이블이 있다면 먼저 삭제
-        with engine.connect() as conn:
-            conn.execute(text(f"DROP TABLE IF EXISTS {temp_table}"))
-            conn.commit()
-            
-        df.to_sql(temp_table, engine, if_exists='replace', index=False,
-                 dtype={
-                     'market': String(20),
-                     'timestamp_utc': DateTime(timezone=True),
-                     'timestamp_kst': DateTime(timezone=True),
-                     'open': Numeric(20, 8),
-                     'high': Numeric(20, 8),
-                     'low': Numeric(20, 8),
-                     'close': Numeric(20, 8),
-                     'volume': Numeric(20, 8),
-                     'trade_price': Numeric(30, 8),
-                     'change_rate': Numeric(10, 4),
-                     'created_at': DateTime(timezone=True)
-                 })
-        
-        # INSERT IGNORE 패턴으로 데이터 저장
-        with engine.connect() as conn:
-            insert_query = text(f"""
-                INSERT INTO upbit_daily_price (
-                    market, timestamp_utc, timestamp_kst, open, high, low, close,
-                    volume, trade_price, change_rate, created_at
-                )
-                SELECT 
-                    market, timestamp_utc, timestamp_kst, open, high, low, close,
-                    volume, trade_price, change_rate, created_at
-                FROM {temp_table}
-                ON CONFLICT (market, timestamp_utc)
-                DO NOTHING;
-                
-                DROP TABLE {temp_table};
-            """)
-            
-            result = conn.execute(insert_query)
-            conn.commit()
-        
+
+        save_candles(df, market, 'day')
         return True
-        
+
     except Exception as e:
         print(f"데이터 저장 중 오류 발생: {e}")
         return False
-    
+
 def save_minute_price(market,days=1,candle_type='1hour'):
     """
     업비트 API 의 분봉 데이터를 DB에 저장하는 함수
@@ -115,76 +109,56 @@ def save_minute_price(market,days=1,candle_type='1hour'):
         days (int): 가져올 일 수 (기본값: 1)
         candle_type (str): 분봉 타입 ('1min', '3min', '5min', '10min', '30min', '1hour')
     """
-    if candle_type == '1hour':
-        TABLE_NAME = 'upbit_1hour_price'
-    elif candle_type in ['1min', '3min', '5min', '10min', '30min']:
-        TABLE_NAME = 'upbit_minute_price'
-    else:
+    if candle_type == 'day':
         raise ValueError(f"지원하지 않는 캔들 유형: {candle_type}")
-    
+    get_table_name(candle_type)
+
     try:
         # 데이터 가져오기
         df = fetch_historical_data_min(market, days, candle_type=candle_type)
         if df is None:
             return False
-            
-        # created_at 컬럼 추가
-        df['created_at'] = datetime.now()
-        
-        # 데이터 타입 변환
-        numeric_columns = ['open', 'high', 'low', 'close', 'volume', 'trade_price']
-        for col in numeric_columns:
-            df[col] = pd.to_numeric(df[col], errors='coerce')
-        
-        # DB 연결
-        DATABASE_URL = f"postgresql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
-        engine = create_engine(DATABASE_URL)
-        
-        # 임시 테이블에 데이터 저장
-        timestamp_suffix = datetime.now().strftime('%Y%m%d_%H%M%S')
-        temp_table = f"temp_{market.replace('-', '_').lower()}_{timestamp_suffix}"
-        
-        # 기존 임시 테이블이 있다면 먼저 삭제
-        with engine.connect() as conn:
-            conn.execute(text(f"DROP TABLE IF EXISTS {temp_table}"))
-            conn.commit()
-            
-        df.to_sql(temp_table, engine, if_exists='replace', index=False,
-                 dtype={
-                     'market': String(20),
-                     'timestamp_utc': DateTime(timezone=True),
-                     'timestamp_kst': DateTime(timezone=True),
-                     'open': Numeric(20, 8),
-                     'high': Numeric(20, 8),
-                     'low': Numeric(20, 8),
-                     'close': Numeric(20, 8),
-                     'volume': Numeric(20, 8),
-                     'trade_price': Numeric(30, 8),
-                     'created_at': DateTime(timezone=True)
-                 })
-        
-        # INSERT IGNORE 패턴으로 데이터 저장
-        with engine.connect() as conn:
-            insert_query = text(f"""
-                INSERT INTO {TABLE_NAME} (
-                    market, timestamp_utc, timestamp_kst, open, high, low, close,
-                    volume, trade_price, created_at
-                )
-                SELECT 
-                    market, timestamp_utc, timestamp_kst, open, high, low, close,
-                    volume, trade_price, created_at
-                FROM {temp_table}
-                ON CONFLICT (market, timestamp_utc)
-                DO NOTHING;
-                
-                DROP TABLE {temp_table};
-            """)
-            
-            result = conn.execute(insert_query)
-            conn.commit()
-        
+
+        save_candles(df, market, candle_type)
         return True
-        
+
+    except Exception as e:
+        print(f"데이터 저장 중 오류 발생: {e}")
+        return False
+
+def save_range_price(market, start, end, candle_type='1hour', on_batch=None):
+    """
+    [start, end) 구간의 캔들 데이터를 DB에 저장하는 함수 (UTC 기준)
+
+    Args:
+        market (str): 마켓 코드 (예: 'KRW-BTC')
+        start (datetime): 구간 시작 시점 (UTC, 포함)
+        end (datetime): 구간 종료 시점 (UTC, 미포함)
+        candle_type (str): 캔들 타입 ('day', '1min', '3min', '5min', '10min', '30min', '1hour')
+        on_batch (callable): 배치마다 호출되는 콜백, False 를 반환하면 저장하지 않고 중단함
+
+    Raises:
+        RateLimitError: 요청 수 제한(HTTP 429)에 걸린 경우 (그 전까지 가져온 데이터는 저장하고 발생시킴)
+    """
+    get_table_name(candle_type)
+
+    try:
+        # 데이터 가져오기
+        df = fetch_range_data(market, start, end, candle_type=candle_type, on_batch=on_batch)
+        if df is None:
+            return False
+        if df.empty:
+            return True
+
+        save_candles(df, market, candle_type)
+        return True
+
+    except RateLimitError as e:
+        # 요청 수 제한 전까지 가져온 데이터는 저장해두고 e.resume_end 이전만 다시 수집하도록 함
+        partial = getattr(e, 'partial', None)
+        if partial is not None and not partial.empty:
+            save_candles(partial, market, candle_type)
+        raise
     except Exception as e:
         print(f"데이터 저장 중 오류 발생: {e}")
         return False
@@ -195,4 +169,4 @@ if __name__ == "__main__":
     if success:
         print("저장 성공!")
     else:
-        print("저장 실패!")
\ No newline at end of file
+        print("저장 실패!")
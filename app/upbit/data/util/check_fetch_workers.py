@@ -0,0 +1,160 @@
+"""
+여러 run_fetch_worker 프로세스를 하나의 로컬 Postgres 에 붙여서 작업 분배를 확인하는 스크립트
+
+모든 구간이 'done' 으로 끝나고, 어떤 구간도 두 번 가져가지 않았는지 확인함
+(작업 큐 테이블을 비우므로 로컬 DB 에서만 실행)
+
+사용법 (app/upbit/data 에서):
+    python util/check_fetch_workers.py --workers 4 --reset          # 실제 업비트 API 로 수집
+    python util/check_fetch_workers.py --workers 4 --reset --stub   # API 대신 호출 기록만 남기는 수집 함수 사용
+"""
+from datetime import datetime, timedelta, timezone
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+DATA_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, DATA_DIR)
+
+from sqlalchemy import text
+
+from db_engine import get_engine
+from job_queue import enqueue_jobs, count_jobs, TABLE_NAME
+
+LOG_TABLE = 'fetch_check_log'
+STUB_FETCH_SECONDS = 0.2
+
+def stub_save_range_price(market, start, end, candle_type='1hour', on_batch=None):
+    """
+    업비트 API 대신 (구간, 워커) 를 기록하는 수집 함수
+    """
+    import run_fetch_worker
+    if on_batch is not None and on_batch() is False:
+        return False
+    time.sleep(STUB_FETCH_SECONDS)
+    with get_engine().connect() as conn:
+        conn.execute(text(f"""
+            INSERT INTO {LOG_TABLE} (market, candle_type, window_start, window_end, worker_id)
+            VALUES (:market, :candle_type, :window_start, :window_end, :worker_id)
+        """), {
+            'market': market,
+            'candle_type': candle_type,
+            'window_start': start,
+            'window_end': end,
+            'worker_id': run_fetch_worker.WORKER_ID,
+        })
+        conn.commit()
+    return True
+
+def run_stub_worker():
+    import run_fetch_worker
+    run_fetch_worker.save_range_price = stub_save_range_price
+    run_fetch_worker.main(debug=False, exit_when_idle=True)
+
+def prepare(args):
+    from util.db_table_job import create_tables as create_job_table
+    from util.db_table_min import create_tables as create_1hour_table
+    create_job_table()
+    create_1hour_table()
+
+    engine = get_engine()
+    with engine.connect() as conn:
+        if args.reset:
+            conn.execute(text(f"TRUNCATE {TABLE_NAME}"))
+        elif conn.execute(text(f"SELECT count(*) FROM {TABLE_NAME}")).scalar() > 0:
+            raise SystemExit(f"{TABLE_NAME} 테이블이 비어있지 않습니다. --reset 으로 비운 뒤 실행하세요")
+        conn.execute(text(f"""
+            CREATE TABLE IF NOT EXISTS {LOG_TABLE} (
+                market varchar(20),
+                candle_type varchar(10),
+                window_start timestamp,
+                window_end timestamp,
+                worker_id varchar(100)
+            )
+        """))
+        conn.execute(text(f"TRUNCATE {LOG_TABLE}"))
+        conn.commit()
+
+    end = datetime.now(timezone.utc).replace(tzinfo=None)
+    start = end - timedelta(days=args.days)
+    return enqueue_jobs(args.markets, args.candle_type, start, end, window=timedelta(days=args.window_days))
+
+def check(args, job_count):
+    """
+    결과를 확인하고 실패한 항목 목록을 반환하는 함수
+    """
+    errors = []
+    engine = get_engine()
+    with engine.connect() as conn:
+        statuses = count_jobs()
+        if statuses != {'done': job_count}:
+            errors.append(f"모든 작업이 'done' 이 아닙니다: {statuses}")
+
+        # 시도 횟수는 가져갈 때마다 늘어나므로 1 보다 크면 같은 구간을 두 번 가져간 것
+        claimed_twice = conn.execute(text(f"""
+            SELECT id, market, window_start, attempts FROM {TABLE_NAME} WHERE attempts <> 1
+        """)).all()
+        if claimed_twice:
+            errors.append(f"두 번 이상 가져간 작업: {claimed_twice}")
+
+        workers = conn.execute(text(f"""
+            SELECT worker_id, count(*) FROM {TABLE_NAME} GROUP BY worker_id ORDER BY worker_id
+        """)).all()
+        print(f"워커별 작업 수: {dict(workers)}")
+
+        if args.stub:
+            fetched_twice = conn.execute(text(f"""
+                SELECT market, window_start, count(*) FROM {LOG_TABLE}
+                GROUP BY market, window_start HAVING count(*) > 1
+            """)).all()
+            if fetched_twice:
+                errors.append(f"두 번 이상 수집한 구간: {fetched_twice}")
+            fetched = conn.execute(text(f"SELECT count(*) FROM {LOG_TABLE}")).scalar()
+            if fetched != job_count:
+                errors.append(f"수집 횟수({fetched})가 작업 수({job_count})와 다릅니다")
+    return errors
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--markets', nargs='+', default=["KRW-BTC", "KRW-ETH", "KRW-XRP"])
+    parser.add_argument('--candle-type', default='1hour')
+    parser.add_argument('--days', type=int, default=84)
+    parser.add_argument('--window-days', type=int, default=7)
+    parser.add_argument('--reset', action='store_true', help='작업 큐 테이블을 비우고 시작')
+    parser.add_argument('--stub', action='store_true', help='업비트 API 대신 호출 기록만 남김')
+    parser.add_argument('--stub-worker', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.stub_worker:
+        run_stub_worker()
+        return
+
+    job_count = prepare(args)
+    print(f"================= {datetime.now()} 작업 {job_count}개 등록, 워커 {args.workers}개 시작")
+
+    env = dict(os.environ, EXIT_WHEN_IDLE='1', IDLE_SLEEP='0.5')
+    if args.stub:
+        command = [sys.executable, '-u', os.path.abspath(__file__), '--stub-worker']
+    else:
+        command = [sys.executable, '-u', '-m', 'run_fetch_worker']
+    started = time.monotonic()
+    workers = [
+        subprocess.Popen(command, cwd=DATA_DIR, env=dict(env, WORKER_ID=f"check-{i}"))
+        for i in range(args.workers)
+    ]
+    for worker in workers:
+        worker.wait()
+    print(f"================= {datetime.now()} 워커 종료 ({time.monotonic() - started:.1f}초)")
+
+    errors = check(args, job_count)
+    for error in errors:
+        print(f"실패: {error}")
+    if errors:
+        sys.exit(1)
+    print("성공: 모든 구간이 한 번씩만 수집되었습니다")
+
+if __name__ == "__main__":
+    main()
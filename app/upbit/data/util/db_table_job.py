@@ -0,0 +1,65 @@
+from sqlalchemy import create_engine, Column, String, DateTime, Integer, Text, Index, text
+from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.schema import UniqueConstraint
+import os
+from dotenv import load_dotenv
+
+# .env 파일 로드
+load_dotenv()
+
+# 환경변수 가져오기
+DB_USER = os.getenv('POSTGRES_USER')
+DB_PASSWORD = os.getenv('POSTGRES_PASSWORD')
+DB_NAME = os.getenv('POSTGRES_DB')
+DB_HOST = os.getenv('DB_HOST')
+DB_PORT = os.getenv('DB_PORT')
+
+# Base 클래스 생성
+Base = declarative_base()
+
+# 수집 작업 큐 테이블
+# status: 'pending' -> 'running' -> 'done' / 'failed'
+# lease_until 이 지난 'running' 작업은 다른 워커가 다시 가져감
+# 실패한 작업은 available_at 까지 기다렸다가 다시 가져감 (지수 백오프)
+# 요청 수 제한으로 중단된 작업은 resume_end 이후 구간이 저장되어 있으므로 [window_start, resume_end) 만 다시 수집
+class UpbitFetchJob(Base):
+    __tablename__ = 'upbit_fetch_job'
+
+    id = Column(Integer, primary_key=True)
+    market = Column(String(20), nullable=False)
+    candle_type = Column(String(10), nullable=False)
+    window_start = Column(DateTime, nullable=False)
+    window_end = Column(DateTime, nullable=False)
+    status = Column(String(10), nullable=False, server_default='pending')
+    worker_id = Column(String(100))
+    lease_until = Column(DateTime(timezone=True))
+    heartbeat_at = Column(DateTime(timezone=True))
+    attempts = Column(Integer, nullable=False, server_default='0')
+    available_at = Column(DateTime(timezone=True), nullable=False, server_default=text('now()'))   # 재시도 대기 (이 시점 이후에 가져감)
+    resume_end = Column(DateTime)   # 이어서 수집할 구간의 끝 (없으면 window_end)
+    last_error = Column(Text)
+    created_at = Column(DateTime(timezone=True), nullable=False, server_default=text('now()'))
+    updated_at = Column(DateTime(timezone=True), nullable=False, server_default=text('now()'))
+
+    # 같은 구간이 두 번 등록되지 않도록 unique 로 설정
+    __table_args__ = (
+        UniqueConstraint('market', 'candle_type', 'window_start', 'window_end', name='uix_fetch_job_window'),
+        Index('ix_fetch_job_status_lease', 'status', 'lease_until'),
+        Index('ix_fetch_job_status_available', 'status', 'available_at'),
+    )
+
+def create_tables():
+    try:
+        # 데이터베이스 연결 설정
+        DATABASE_URL = f"postgresql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
+        engine = create_engine(DATABASE_URL)
+
+        # 테이블 생성
+        Base.metadata.create_all(engine)
+        print("테이블이 성공적으로 생성되었습니다.")
+
+    except Exception as e:
+        print(f"테이블 생성 중 오류 발생: {e}")
+
+if __name__ == "__main__":
+    create_tables()